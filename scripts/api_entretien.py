@@ -10,17 +10,44 @@ Fonctionnalités :
 - Validation stricte des entrées (Pydantic)
 - Réponses structurées et exemples interactifs
 - CORS configuré pour le frontend React
+- Inférence hors de la boucle d'événements (pool de threads borné + micro-batching)
+- Cache LRU des prédictions pour les candidats déjà vus
+- Service via ONNX Runtime si le pipeline a été exporté (scripts/exporte_onnx.py)
+- Scoreur compilé (Numba) pour les pipelines « prétraitement + régression logistique »
+- Variables catégorielles encodées en entiers à partir de tables précalculées au démarrage
 """
 
-from fastapi import FastAPI, Body
+import asyncio
+import copy
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import anyio.to_thread
+from fastapi import FastAPI, Body, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, constr
-from fastapi.responses import HTMLResponse
+from pydantic import BaseModel, Field, StringConstraints
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response, StreamingResponse
 import joblib
+import orjson
+import numpy as np
 import pandas as pd
-from typing import List, Optional
+from typing import Annotated, List, Optional
 import os
 
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, StandardScaler
+
+try:
+    import onnxruntime as ort
+except ImportError:  # ONNX Runtime est optionnel : on sert alors le pipeline joblib
+    ort = None
+
+try:
+    from numba import njit
+except ImportError:  # Numba est optionnel : pas de scoreur compilé pour les modèles linéaires
+    njit = None
+
 app = FastAPI(
     title="API Prédiction Entretien d'Embauche",
     description="""
@@ -29,68 +56,548 @@ API professionnelle pour prédire le succès d'un entretien d'embauche à partir
 **Endpoints :**
 - `POST /predict` : Prédiction pour un candidat
 - `POST /predict_batch` : Prédiction pour plusieurs candidats
+- `POST /predict_batch_stream` : Prédiction pour plusieurs candidats, diffusée en NDJSON
 
 Documentation interactive : `/docs`
 """,
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
-# Configuration CORS TRÈS permissive pour le développement
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Permet toutes les origines en développement
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Configuration CORS TRÈS permissive pour le développement (ENABLE_CORS=0 pour la désactiver en production)
+if os.getenv("ENABLE_CORS", "1") == "1":
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Permet toutes les origines en développement
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+# Repli sur le modèle de démonstration si aucun modèle n'est trouvé (ALLOW_MOCK_MODEL=0 pour l'interdire)
+ALLOW_MOCK_MODEL = os.getenv("ALLOW_MOCK_MODEL", "1") == "1"
 
-# Chargement du pipeline sauvegardé (joblib)
+# Pipeline sauvegardé (joblib), chargé et préchauffé au démarrage de l'API
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "model", "pipeline_entretien.joblib")
+# Export ONNX du même pipeline, servi en priorité s'il existe
+ONNX_PATH = os.path.join(os.path.dirname(__file__), "model", "pipeline_entretien.onnx")
 
-# Pour éviter l'erreur si le modèle n'existe pas, créons un modèle mock
-try:
-    pipeline = joblib.load(MODEL_PATH)
-except:
+
+# Modèle mock pour la démonstration, utilisé si le modèle n'existe pas
+class MockPipeline:
+    def predict(self, data):
+        # Retourne une prédiction basée sur l'âge et l'expérience
+        return ((data['age'].to_numpy() > 25) & (data['experience'].to_numpy() > 2)).astype(int)
+
+    def predict_proba(self, data):
+        # Retourne des probabilités de démonstration :
+        # élevées pour les candidats retenus, faibles pour les autres
+        predictions = self.predict(data).astype(bool)
+        haute = np.random.uniform(0.7, 0.95, predictions.size)
+        basse = np.random.uniform(0.1, 0.4, predictions.size)
+        prob = np.where(predictions, haute, basse)
+        return np.column_stack([1 - prob, prob])
+
+
+class OnnxPipeline:
+    """Pipeline exporté en ONNX, exécuté en un seul graphe par ONNX Runtime."""
+
+    def __init__(self, path):
+        self.session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        # (nom de la colonne, True si l'entrée est une chaîne) pour chaque entrée du graphe
+        self.inputs = [(i.name, i.type == "tensor(string)") for i in self.session.get_inputs()]
+
+    def _run(self, data):
+        feeds = {}
+        for name, is_string in self.inputs:
+            column = data[name].to_numpy(dtype=object if is_string else np.float32)
+            feeds[name] = column.reshape(-1, 1)
+        return self.session.run(None, feeds)
+
+    def predict(self, data):
+        return self._run(data)[0]
+
+    def predict_proba(self, data):
+        return self._run(data)[1]
+
+
+def _category_tables(encoder):
+    """
+    Tables modalité -> indice de chaque variable d'un OneHotEncoder entraîné.
+
+    Lève ValueError si l'encodage ne se réduit pas à ces tables (drop, modalités rares) ou
+    si une modalité inconnue n'est pas ignorée : le code -1 donnerait une ligne de zéros là
+    où sklearn lève une erreur.
+    """
+    if encoder.handle_unknown not in ("ignore", "infrequent_if_exist"):
+        raise ValueError("modalités inconnues non ignorées par l'encodeur")
+    if encoder.drop_idx_ is not None or any(
+            c is not None for c in getattr(encoder, "infrequent_categories_", [])):
+        raise ValueError("encodage one-hot non supporté")
+    return [{category: i for i, category in enumerate(categories)} for categories in encoder.categories_]
+
+
+def _score_lineaire(numeric, codes, coef, offsets, biais):
+    """
+    Probabilité de la classe positive : sigmoid(biais + poids·x + poids des modalités).
+
+    numeric contient les variables numériques déjà imputées, dont la standardisation est
+    repliée dans les poids ; codes contient l'indice de modalité de chaque variable
+    catégorielle (-1 si inconnue, ignorée comme par OneHotEncoder(handle_unknown='ignore')).
+    """
+    n = numeric.shape[0]
+    probas = np.empty(n)
+    for i in range(n):
+        z = biais
+        for j in range(numeric.shape[1]):
+            z += coef[j] * numeric[i, j]
+        for k in range(codes.shape[1]):
+            code = codes[i, k]
+            if code >= 0:
+                z += coef[offsets[k] + code]
+        probas[i] = 1.0 / (1.0 + np.exp(-z))
+    return probas
+
+
+if njit is not None:
+    _score_lineaire = njit(fastmath=True)(_score_lineaire)
+
+
+class LinearScorer:
+    """
+    Pipeline « ColumnTransformer (imputation + standardisation / one-hot) + régression
+    logistique binaire » réduit à ses poids, évalué par le noyau compilé _score_lineaire.
+
+    Lève ValueError si le pipeline n'a pas cette forme.
+    """
+
+    def __init__(self, pipeline):
+        if not isinstance(pipeline, Pipeline) or len(pipeline.steps) != 2:
+            raise ValueError("pipeline attendu : prétraitement + classifieur")
+        preproc, clf = pipeline.steps[0][1], pipeline.steps[1][1]
+        if (not isinstance(clf, LogisticRegression) or clf.coef_.shape[0] != 1
+                or getattr(clf, "multi_class", "auto") == "multinomial"):
+            raise ValueError("classifieur attendu : régression logistique binaire")
+
+        # Copie : la standardisation est repliée sur place, sans toucher clf.coef_ (souvent une memmap en lecture seule)
+        coef = np.array(clf.coef_[0], dtype=np.float64, copy=True)
+        biais = float(clf.intercept_[0])
+        numeric_columns, numeric_positions, fill = [], [], []
+        categorical_columns, tables, offsets = [], [], []
+        position = 0
+        for _, transformer, columns in preproc.transformers_:
+            if isinstance(transformer, str) and transformer == "drop":
+                continue
+            if not all(isinstance(col, str) for col in columns):
+                raise ValueError("colonnes attendues par nom")
+            steps = [step for _, step in transformer.steps] if isinstance(transformer, Pipeline) else [transformer]
+            *avant, dernier = steps
+            imputer = avant[0] if avant else None
+            if len(avant) > 1 or (imputer is not None and (
+                    not isinstance(imputer, SimpleImputer) or imputer.add_indicator)):
+                raise ValueError("prétraitement non supporté")
+
+            if isinstance(dernier, StandardScaler):
+                k = len(columns)
+                # mean_ reste renseigné avec with_mean=False mais transform l'ignore
+                mean = dernier.mean_ if dernier.with_mean else np.zeros(k)
+                scale = dernier.scale_ if dernier.with_std else np.ones(k)
+                # Standardisation repliée : w·(x - mean)/scale = (w/scale)·x - (w/scale)·mean
+                poids = coef[position:position + k] / scale
+                coef[position:position + k] = poids
+                biais -= float(poids @ mean)
+                numeric_columns.extend(columns)
+                numeric_positions.extend(range(position, position + k))
+                fill.extend(imputer.statistics_ if imputer is not None else np.full(k, np.nan))
+                position += k
+            elif isinstance(dernier, OneHotEncoder):
+                for col, table in zip(columns, _category_tables(dernier)):
+                    categorical_columns.append(col)
+                    tables.append(table)
+                    offsets.append(position)
+                    position += len(table)
+            else:
+                raise ValueError("prétraitement non supporté")
+        if position != coef.size:
+            raise ValueError("nombre de variables incohérent avec le modèle")
+        if set(categorical_columns) != set(CATEGORICAL_COLUMNS):
+            raise ValueError("variables catégorielles inattendues")
+
+        # Poids des numériques en tête, dans l'ordre de numeric_columns ; modalités ensuite
+        self.coef = np.concatenate([coef[numeric_positions], coef])
+        self.offsets = np.asarray(offsets, dtype=np.int64) + len(numeric_positions)
+        self.biais = biais
+        self.numeric_columns = numeric_columns
+        self.fill = np.asarray(fill, dtype=np.float32)
+        self.categorical_columns = categorical_columns
+        # Les catégorielles arrivent déjà encodées par _build_frame à partir de ces tables
+        self.category_codes = dict(zip(categorical_columns, tables))
+        self.classes_ = clf.classes_
+
+    def predict_proba(self, data):
+        numeric = data[self.numeric_columns].to_numpy(dtype=np.float32)
+        numeric = np.where(np.isnan(numeric), self.fill, numeric)
+        codes = data[self.categorical_columns].to_numpy(dtype=np.int64)
+        probas = _score_lineaire(numeric, codes, self.coef, self.offsets, self.biais)
+        return np.column_stack([1 - probas, probas])
+
+    def predict(self, data):
+        return self.classes_[(self.predict_proba(data)[:, 1] > 0.5).astype(int)]
+
+
+def _one_hot_codes(X, sizes):
+    """One-hot à partir des codes entiers (-1 = modalité inconnue, ligne de zéros)."""
+    codes = np.asarray(X, dtype=np.int64)
+    out = np.zeros((codes.shape[0], sum(sizes)))
+    offset = 0
+    for k, size in enumerate(sizes):
+        known = np.flatnonzero(codes[:, k] >= 0)
+        out[known, offset + codes[known, k]] = 1.0
+        offset += size
+    return out
+
+
+class EncodedPipeline:
+    """
+    Pipeline sklearn servi avec ses variables catégorielles pré-encodées en entiers.
+
+    La branche catégorielle du ColumnTransformer (imputation + OneHotEncoder) est remplacée,
+    dans une copie servant uniquement à l'inférence, par un one-hot direct sur les codes ;
+    le pipeline d'origine reste intact pour le réentraînement. Lève ValueError si le
+    pipeline n'a pas de branche one-hot reproductible portant sur CATEGORICAL_COLUMNS.
+    """
+
+    def __init__(self, pipeline):
+        if not isinstance(pipeline, Pipeline):
+            raise ValueError("pipeline sklearn attendu")
+        preproc = pipeline.steps[0][1]
+        transformers = list(preproc.transformers_)
+        for index, (name, transformer, columns) in enumerate(transformers):
+            steps = [step for _, step in transformer.steps] if isinstance(transformer, Pipeline) else [transformer]
+            if isinstance(steps[-1], OneHotEncoder):
+                break
+        else:
+            raise ValueError("pas de branche one-hot dans le prétraitement")
+        if tuple(columns) != tuple(c for c in COLUMNS if c in CATEGORICAL_COLUMNS) or not all(
+                isinstance(step, SimpleImputer) for step in steps[:-1]):
+            raise ValueError("branche catégorielle non supportée")
+        tables = _category_tables(steps[-1])
+
+        one_hot = FunctionTransformer(_one_hot_codes, kw_args={"sizes": [len(t) for t in tables]})
+        one_hot.fit(pd.DataFrame(np.zeros((1, len(columns)), dtype=np.int32), columns=columns))
+        transformers[index] = (name, one_hot, columns)
+
+        # Copies superficielles : les tableaux (éventuellement projetés en mémoire) restent partagés
+        serving_preproc = copy.copy(preproc)
+        serving_preproc.transformers_ = transformers
+        self.pipeline = copy.copy(pipeline)
+        self.pipeline.steps = [(pipeline.steps[0][0], serving_preproc)] + pipeline.steps[1:]
+        self.category_codes = dict(zip(columns, tables))
+        self.classes_ = pipeline.classes_
+
+    def predict_proba(self, data):
+        return self.pipeline.predict_proba(data)
+
+    def predict(self, data):
+        return self.pipeline.predict(data)
+
+
+def load_pipeline():
+    """
+    Charge le modèle à servir, du plus rapide au plus général : scoreur compilé si le
+    pipeline est linéaire, export ONNX s'il existe, pipeline joblib, puis modèle de démonstration.
+    """
+    try:
+        # mmap_mode='r' : les tableaux numpy du modèle sont projetés en lecture seule,
+        # leurs pages sont donc partagées entre les workers (gunicorn/uvicorn) au lieu d'être copiées
+        pipeline = joblib.load(MODEL_PATH, mmap_mode='r')
+    except Exception:
+        pipeline = None
+    if pipeline is not None and njit is not None:
+        try:
+            return LinearScorer(pipeline)
+        except (AttributeError, ValueError):
+            pass  # Pipeline non linéaire : ONNX ou sklearn
+    if ort is not None and os.path.exists(ONNX_PATH):
+        return OnnxPipeline(ONNX_PATH)
+    if pipeline is not None:
+        try:
+            return EncodedPipeline(pipeline)
+        except (AttributeError, ValueError):
+            return pipeline
+    if not ALLOW_MOCK_MODEL:
+        raise RuntimeError(f"Modèle introuvable : {MODEL_PATH}")
     print("⚠️  Modèle non trouvé, utilisation d'un modèle de démonstration")
-    # Modèle mock pour la démonstration
-    class MockPipeline:
-        def predict(self, data):
-            # Retourne une prédiction basée sur l'âge et l'expérience
-            return [1 if (row['age'] > 25 and row['experience'] > 2) else 0 
-                   for _, row in data.iterrows()]
-        
-        def predict_proba(self, data):
-            # Retourne des probabilités de démonstration
-            import numpy as np
-            predictions = self.predict(data)
-            probas = []
-            for pred in predictions:
-                if pred == 1:
-                    # Probabilité élevée pour les candidats retenus
-                    prob = np.random.uniform(0.7, 0.95)
-                else:
-                    # Probabilité faible pour les candidats non retenus
-                    prob = np.random.uniform(0.1, 0.4)
-                probas.append([1-prob, prob])
-            return np.array(probas)
-    
-    pipeline = MockPipeline()
+    return MockPipeline()
+
+
+async def get_pipeline():
+    """
+    Dépendance FastAPI : pipeline chargé au démarrage et partagé via app.state.
+
+    Asynchrone pour être résolue sur la boucle d'événements, sans passage par le pool anyio.
+    """
+    return app.state.pipeline
+
+# Taille du pool de threads d'inférence (créé au démarrage dans app.state.cpu_pool) :
+# l'inférence est CPU-bound, un thread par CPU suffit et borne les changements de contexte
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", os.cpu_count() or 1))
+
+# Paramètres du micro-batching des requêtes /predict concurrentes
+BATCH_MAX_SIZE = 64
+BATCH_MAX_WAIT = 0.005  # secondes
+
+
+# Ordre des colonnes attendu par le pipeline (ColumnTransformer indexé par nom)
+COLUMNS = (
+    "age",
+    "diplome",
+    "note_anglais",
+    "experience",
+    "entreprises_precedentes",
+    "distance_km",
+    "score_entretien",
+    "score_competence",
+    "score_personnalite",
+    "sexe",
+)
+
+
+def _candidat_row(c):
+    """
+    Tuple des caractéristiques d'un candidat, dans l'ordre de COLUMNS.
+
+    Lecture directe des attributs validés : pas d'aller-retour par model_dump(), et le
+    tuple sert à la fois de ligne pour _build_frame et de clé pour le cache.
+    """
+    return (
+        c.age,
+        c.diplome,
+        c.note_anglais,
+        c.experience,
+        c.entreprises_precedentes,
+        c.distance_km,
+        c.score_entretien,
+        c.score_competence,
+        c.score_personnalite,
+        c.sexe,
+    )
+
+
+# Colonnes catégorielles (chaînes encodées par le OneHotEncoder du pipeline)
+CATEGORICAL_COLUMNS = ("diplome", "sexe")
+# Indices des colonnes numériques dans COLUMNS
+NUMERIC_INDEXES = tuple(i for i, col in enumerate(COLUMNS) if col not in CATEGORICAL_COLUMNS)
+
+
+def _build_frame(rows, category_codes=None):
+    """
+    Construit le DataFrame d'entrée à partir de tuples.
+
+    Les colonnes numériques sont assemblées en un seul bloc float32 (None devient NaN,
+    imputé par le pipeline). Les catégorielles sont encodées en entiers via category_codes
+    (tables précalculées du modèle servi, -1 pour une modalité inconnue) ou restent des
+    chaînes si le modèle n'en fournit pas.
+    """
+    columns = list(zip(*rows))
+    numeric = np.array([columns[i] for i in NUMERIC_INDEXES], dtype=np.float32)
+    data = {COLUMNS[i]: values for i, values in zip(NUMERIC_INDEXES, numeric)}
+    for col in CATEGORICAL_COLUMNS:
+        values = columns[COLUMNS.index(col)]
+        if category_codes is None:
+            data[col] = np.array(values, dtype=object)
+        else:
+            table = category_codes[col]
+            data[col] = np.fromiter((table.get(v, -1) for v in values), dtype=np.int32, count=len(values))
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+# Candidat fictif (ordre de COLUMNS) utilisé pour préchauffer le pipeline au démarrage
+_WARMUP_ROW = (30, "BTS", 85.0, 5, 2, 4.5, 8.2, 7.5, 80.0, "F")
+
+
+# Classes par défaut des modèles sans attribut classes_ (démonstration, ONNX)
+BINARY_CLASSES = np.array([0, 1])
+
+
+def _predict(pipeline, rows):
+    """
+    Exécute le pipeline sur des tuples de candidats (appelé dans le pool de threads).
+
+    Un seul predict_proba : la classe prédite en est déduite (équivalent à l'argmax
+    pour un classifieur binaire), ce qui évite de refaire le prétraitement pour predict.
+    """
+    data = _build_frame(rows, getattr(pipeline, "category_codes", None))
+    probas = pipeline.predict_proba(data)[:, 1]
+    classes = getattr(pipeline, "classes_", BINARY_CLASSES)
+    return classes[(probas > 0.5).astype(int)], probas
+
+
+class PredictionBatcher:
+    """
+    Regroupe les requêtes /predict concurrentes en un seul appel au pipeline.
+
+    Chaque requête dépose (ligne, future) dans la file ; une tâche de fond
+    vide la file (jusqu'à BATCH_MAX_SIZE éléments ou BATCH_MAX_WAIT secondes),
+    prédit le lot dans le pool de threads puis résout chaque future.
+
+    Créé au démarrage de l'API (app.state.batcher) : la file et la tâche appartiennent
+    à la boucle d'événements en cours, ce qui permet d'arrêter puis de relancer l'application.
+    """
+
+    def __init__(self, pipeline, pool, max_size=BATCH_MAX_SIZE, max_wait=BATCH_MAX_WAIT):
+        self.pipeline = pipeline
+        self.pool = pool
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.items = []  # Lot en cours de prédiction
+        self.task = None
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+        # Si la tâche s'arrête (annulation ou erreur inattendue), aucune requête ne doit rester en attente
+        self.task.add_done_callback(lambda _: self._fail_pending())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self._fail_pending()
+
+    def _fail_pending(self):
+        """Fait échouer les futures du lot en cours et celles encore en file."""
+        pending, self.items = self.items, []
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("service de prédiction arrêté"))
+
+    async def predict(self, row):
+        if not self.running:
+            raise RuntimeError("service de prédiction arrêté")
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self.items = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(self.items) < self.max_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    self.items.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            rows = [row for row, _ in self.items]
+            try:
+                predictions, probas = await loop.run_in_executor(self.pool, _predict, self.pipeline, rows)
+            except Exception as exc:
+                for _, future in self.items:
+                    if not future.done():
+                        future.set_exception(exc)
+                self.items = []
+                continue
+            for (_, future), pred, proba in zip(self.items, predictions, probas):
+                if not future.done():
+                    future.set_result((int(pred), float(proba)))
+            self.items = []
+
+
+async def get_batcher():
+    """Dépendance FastAPI : batcher créé au démarrage ; 503 s'il ne tourne pas."""
+    batcher = getattr(app.state, "batcher", None)
+    if batcher is None or not batcher.running:
+        raise HTTPException(status_code=503, detail="Service de prédiction indisponible")
+    return batcher
+
+
+# Taille maximale du cache des prédictions
+CACHE_MAX_SIZE = 10_000
+
+
+class PredictionCache:
+    """
+    Cache LRU des prédictions, indexé par le tuple des caractéristiques du candidat.
+
+    Utilisé uniquement depuis la boucle d'événements, il n'a pas besoin de verrou.
+    """
+
+    def __init__(self, max_size=CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+cache = PredictionCache()
+
+
+@app.on_event("startup")
+async def _startup():
+    # L'inférence passe explicitement par un pool dimensionné sur les CPU. Endpoints et
+    # dépendances de l'API sont asynchrones : le pool anyio (40 threads par défaut) ne sert
+    # plus qu'à Starlette pour ses tâches synchrones internes
+    app.state.cpu_pool = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix="inference")
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = (os.cpu_count() or 1) * 2
+
+    pipeline = load_pipeline()
+    # Préchauffage : le premier predict_proba paie les allocations internes de sklearn/pandas
+    # (et la compilation JIT du scoreur linéaire)
+    _predict(pipeline, [_WARMUP_ROW])
+    app.state.pipeline = pipeline
+    cache.clear()
+    app.state.batcher = PredictionBatcher(pipeline, app.state.cpu_pool)
+    app.state.batcher.start()
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await app.state.batcher.stop()
+    app.state.cpu_pool.shutdown(wait=False)
 
 class Candidat(BaseModel):
-    age: int = Field(..., example=30, ge=15, le=70, description="Âge du candidat")
-    diplome: str = Field(..., example="BTS", description="Niveau de diplôme")
-    note_anglais: float = Field(..., example=85, ge=0, le=100, description="Score au test d'anglais")
-    experience: int = Field(..., example=5, ge=0, le=50, description="Années d'expérience")
-    entreprises_precedentes: Optional[int] = Field(0, example=2, ge=0, le=20, description="Nombre d'entreprises précédentes")
-    distance_km: Optional[float] = Field(0.0, example=4.5, ge=0, le=1000, description="Distance domicile-entreprise (km)")
-    score_entretien: Optional[float] = Field(0.0, example=8.2, ge=0, le=10, description="Score d'entretien sur 10")
-    score_competence: Optional[float] = Field(0.0, example=7.5, ge=0, le=10, description="Score de compétence sur 10")
-    score_personnalite: Optional[float] = Field(0.0, example=80, ge=0, le=100, description="Score de personnalité")
-    sexe: constr(strip_whitespace=True, min_length=1) = Field(..., example="F", description="Sexe du candidat (M/F)")
+    age: int = Field(..., examples=[30], ge=15, le=70, description="Âge du candidat")
+    diplome: str = Field(..., examples=["BTS"], description="Niveau de diplôme")
+    note_anglais: float = Field(..., examples=[85], ge=0, le=100, description="Score au test d'anglais")
+    experience: int = Field(..., examples=[5], ge=0, le=50, description="Années d'expérience")
+    entreprises_precedentes: Optional[int] = Field(0, examples=[2], ge=0, le=20, description="Nombre d'entreprises précédentes")
+    distance_km: Optional[float] = Field(0.0, examples=[4.5], ge=0, le=1000, description="Distance domicile-entreprise (km)")
+    score_entretien: Optional[float] = Field(0.0, examples=[8.2], ge=0, le=10, description="Score d'entretien sur 10")
+    score_competence: Optional[float] = Field(0.0, examples=[7.5], ge=0, le=10, description="Score de compétence sur 10")
+    score_personnalite: Optional[float] = Field(0.0, examples=[80], ge=0, le=100, description="Score de personnalité")
+    sexe: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)] = Field(..., examples=["F"], description="Sexe du candidat (M/F)")
 
 class PredictionResponse(BaseModel):
-    prediction: int = Field(..., example=1, description="1 = retenu, 0 = non retenu")
-    probabilite_retenu: float = Field(..., example=0.87, description="Probabilité d'être retenu")
+    prediction: int = Field(..., examples=[1], description="1 = retenu, 0 = non retenu")
+    probabilite_retenu: float = Field(..., examples=[0.87], description="Probabilité d'être retenu")
 
 @app.post(
     "/predict",
@@ -101,7 +608,7 @@ class PredictionResponse(BaseModel):
     description="Prédisez si un candidat sera retenu à partir de ses caractéristiques."
 )
 async def predict_candidat(
-    candidat: Candidat = Body(..., example={
+    candidat: Candidat = Body(..., examples=[{
         "age": 30,
         "diplome": "BTS",
         "note_anglais": 85,
@@ -112,12 +619,16 @@ async def predict_candidat(
         "score_competence": 7.5,
         "score_personnalite": 80,
         "sexe": "F"
-    })
+    }]),
+    batcher=Depends(get_batcher),
 ):
-    """Prédiction pour un candidat unique."""
-    data = pd.DataFrame([candidat.dict()])
-    prediction = pipeline.predict(data)[0]
-    proba = pipeline.predict_proba(data)[0][1]
+    """Prédiction pour un candidat unique (regroupée en micro-batch avec les requêtes concurrentes)."""
+    row = _candidat_row(candidat)
+    result = cache.get(row)
+    if result is None:
+        result = await batcher.predict(row)
+        cache.put(row, result)
+    prediction, proba = result
     return PredictionResponse(prediction=int(prediction), probabilite_retenu=round(float(proba), 4))
 
 @app.post(
@@ -129,7 +640,7 @@ async def predict_candidat(
     description="Prédisez pour une liste de candidats (batch)."
 )
 async def predict_batch(
-    candidats: List[Candidat] = Body(..., example=[{
+    candidats: List[Candidat] = Body(..., examples=[[{
         "age": 30,
         "diplome": "BTS",
         "note_anglais": 85,
@@ -140,18 +651,80 @@ async def predict_batch(
         "score_competence": 7.5,
         "score_personnalite": 80,
         "sexe": "F"
-    }])
+    }]]),
+    pipeline=Depends(get_pipeline),
 ):
-    """Prédiction batch pour plusieurs candidats."""
-    data = pd.DataFrame([c.dict() for c in candidats])
-    predictions = pipeline.predict(data)
-    probas = pipeline.predict_proba(data)[:, 1]
-    return [PredictionResponse(prediction=int(pred), probabilite_retenu=round(float(proba), 4)) for pred, proba in zip(predictions, probas)]
+    """Prédiction batch pour plusieurs candidats (doublons et candidats en cache prédits une seule fois)."""
+    rows = [_candidat_row(c) for c in candidats]
+    results = {row: cache.get(row) for row in rows}
+    missing = [row for row, result in results.items() if result is None]
+    if missing:
+        loop = asyncio.get_running_loop()
+        predictions, probas = await loop.run_in_executor(app.state.cpu_pool, _predict, pipeline, missing)
+        for row, pred, proba in zip(missing, predictions, probas):
+            results[row] = (int(pred), float(proba))
+            cache.put(row, results[row])
+    # Réponse sérialisée directement par orjson, sans construire un PredictionResponse par candidat
+    return ORJSONResponse([
+        {"prediction": pred, "probabilite_retenu": round(proba, 4)}
+        for pred, proba in map(results.get, rows)
+    ])
 
-@app.get("/", tags=["Accueil"], summary="Accueil de l'API", response_class=HTMLResponse)
-def root():
-    """Page d'accueil HTML simple pour l'API."""
-    return """
+# Nombre de candidats prédits par bloc dans /predict_batch_stream
+STREAM_CHUNK_SIZE = 1024
+
+
+@app.post(
+    "/predict_batch_stream",
+    response_class=StreamingResponse,
+    summary="Prédire pour plusieurs candidats (flux NDJSON)",
+    tags=["Prédiction"],
+    response_description="Une ligne JSON par candidat, dans l'ordre de la requête",
+    description="Prédisez pour une grande liste de candidats : les résultats sont diffusés par blocs "
+                "au format NDJSON (`application/x-ndjson`), une ligne par candidat."
+)
+async def predict_batch_stream(
+    candidats: List[Candidat] = Body(..., examples=[[{
+        "age": 30,
+        "diplome": "BTS",
+        "note_anglais": 85,
+        "experience": 5,
+        "entreprises_precedentes": 2,
+        "distance_km": 4.5,
+        "score_entretien": 8.2,
+        "score_competence": 7.5,
+        "score_personnalite": 80,
+        "sexe": "F"
+    }]]),
+    pipeline=Depends(get_pipeline),
+):
+    """
+    Prédiction batch diffusée par blocs de STREAM_CHUNK_SIZE candidats.
+
+    Le bloc suivant est prédit dans le pool de threads pendant que le bloc courant est
+    sérialisé et envoyé : la mémoire reste bornée et le premier octet part après un bloc.
+    """
+    rows = [_candidat_row(c) for c in candidats]
+    chunks = [rows[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(rows), STREAM_CHUNK_SIZE)]
+
+    async def lignes():
+        loop = asyncio.get_running_loop()
+        if chunks:
+            pending = loop.run_in_executor(app.state.cpu_pool, _predict, pipeline, chunks[0])
+        for i in range(len(chunks)):
+            predictions, probas = await pending
+            if i + 1 < len(chunks):
+                pending = loop.run_in_executor(app.state.cpu_pool, _predict, pipeline, chunks[i + 1])
+            yield b"".join(
+                orjson.dumps({"prediction": int(pred), "probabilite_retenu": round(float(proba), 4)}) + b"\n"
+                for pred, proba in zip(predictions, probas)
+            )
+
+    return StreamingResponse(lignes(), media_type="application/x-ndjson")
+
+# Page d'accueil et état de santé construits une seule fois : les réponses (corps déjà
+# encodé en octets) sont réutilisées telles quelles, par exemple pour les sondes de vivacité
+_ROOT_HTML = """
     <html>
         <head>
             <title>API Prédiction Entretien d'Embauche</title>
@@ -174,6 +747,7 @@ def root():
                 <ul>
                     <li><b>POST</b> <code>/predict</code> : Prédiction pour un candidat</li>
                     <li><b>POST</b> <code>/predict_batch</code> : Prédiction pour plusieurs candidats</li>
+                    <li><b>POST</b> <code>/predict_batch_stream</code> : Prédiction pour plusieurs candidats (flux NDJSON)</li>
                 </ul>
                 <p><b>CORS configuré pour :</b></p>
                 <ul>
@@ -185,11 +759,21 @@ def root():
         </body>
     </html>
     """
+_ROOT_RESPONSE = HTMLResponse(content=_ROOT_HTML)
+_HEALTH_RESPONSE = Response(
+    content=orjson.dumps({"status": "healthy", "message": "API opérationnelle", "version": "1.0.0"}),
+    media_type="application/json",
+)
+
+@app.get("/", tags=["Accueil"], summary="Accueil de l'API", response_class=HTMLResponse)
+async def root():
+    """Page d'accueil HTML simple pour l'API."""
+    return _ROOT_RESPONSE
 
 @app.get("/health", tags=["Status"])
-def health_check():
+async def health_check():
     """Endpoint pour vérifier l'état de l'API."""
-    return {"status": "healthy", "message": "API opérationnelle", "version": "1.0.0"}
+    return _HEALTH_RESPONSE
 
 if __name__ == "__main__":
     import uvicorn
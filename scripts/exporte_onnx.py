@@ -0,0 +1,57 @@
+import copy
+import os
+
+import joblib
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType, StringTensorType
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), "model")
+MODEL_PATH = os.path.join(MODEL_DIR, "pipeline_entretien.joblib")
+ONNX_PATH = os.path.join(MODEL_DIR, "pipeline_entretien.onnx")
+
+# Colonnes catégorielles (encodées par le OneHotEncoder du pipeline)
+CATEGORICAL = ('diplome', 'sexe')
+
+def sans_imputation_categorielle(pipeline):
+    """
+    Copie du pipeline pour l'export, sans SimpleImputer dans les branches catégorielles.
+
+    skl2onnx ne convertit pas un SimpleImputer sur des chaînes dont missing_values est NaN
+    (réglage par défaut du notebook). diplome et sexe sont des champs obligatoires de l'API,
+    jamais manquants : cette imputation est sans effet à l'inférence. Le pipeline d'origine
+    n'est pas modifié.
+    """
+    preproc = copy.copy(pipeline.steps[0][1])
+    transformers = []
+    for name, transformer, columns in preproc.transformers_:
+        if isinstance(transformer, Pipeline) and all(col in CATEGORICAL for col in columns):
+            steps = [(n, step) for n, step in transformer.steps if not isinstance(step, SimpleImputer)]
+            transformer = Pipeline(steps)
+        transformers.append((name, transformer, columns))
+    preproc.transformers_ = transformers
+    export = copy.copy(pipeline)
+    export.steps = [(pipeline.steps[0][0], preproc)] + pipeline.steps[1:]
+    return export
+
+
+pipeline = sans_imputation_categorielle(joblib.load(MODEL_PATH))
+
+# Une entrée ONNX par colonne : les catégorielles en chaînes, les numériques en float32
+initial_types = [
+    (col, StringTensorType([None, 1]) if col in CATEGORICAL else FloatTensorType([None, 1]))
+    for col in pipeline.feature_names_in_
+]
+
+# zipmap=False : les probabilités sortent en tenseur (n, 2) comme predict_proba
+classifier = pipeline.steps[-1][1]
+onnx_model = convert_sklearn(
+    pipeline,
+    initial_types=initial_types,
+    options={id(classifier): {'zipmap': False}},
+)
+
+with open(ONNX_PATH, "wb") as f:
+    f.write(onnx_model.SerializeToString())
+print(f"Pipeline ONNX sauvegardé dans : {ONNX_PATH}")
@@ -1,45 +1,54 @@
 import numpy as np
 import pandas as pd
 
-np.random.seed(42)
+rng = np.random.default_rng(42)
 n = 5000  # Par classe (donc 10000 au total ensuite)
 
-def generate_data(n, label):
+def generate_data(labels, rng):
     """
-    label=1: admis
-    label=0: non-admis
+    labels : tableau (déjà mélangé) des classes, 1 = admis, 0 = non-admis.
+    rng : générateur numpy (np.random.Generator) utilisé pour tous les tirages.
     Génère des variables dont la distribution favorise ou défavorise l'admission.
+    Chaque variable est tirée pour les deux distributions en une seule passe,
+    puis np.where retient, candidat par candidat, celle de sa classe.
     """
+    m = labels.size
+    admis = labels == 1
+
     # Diplôme fortement discriminant
-    if label == 1:
-        diplome = np.random.choice(['Licence', 'Master', 'Doctorat'], n, p=[0.3, 0.55, 0.15])
-        note_anglais = np.random.normal(78, 10, n).clip(62, 100)
-        experience = np.random.randint(3, 16, n)
-        entreprises_precedentes = np.random.poisson(2.2, n)
-        distance_km = np.abs(np.random.normal(5, 3, n)).clip(0, 20)
-        score_entretien = np.random.normal(8.2, 0.8, n).clip(6.5, 10)
-        score_competence = np.random.normal(8.1, 0.85, n).clip(6, 10)
-        score_personnalite = np.random.normal(82, 8, n).clip(65, 100).astype(int)
-    else:
-        diplome = np.random.choice(['BTS', 'Licence', 'Master'], n, p=[0.55, 0.40, 0.05])
-        note_anglais = np.random.normal(58, 15, n).clip(0, 75)
-        experience = np.random.randint(0, 8, n)
-        entreprises_precedentes = np.random.poisson(1.2, n)
-        distance_km = np.abs(np.random.normal(13, 7, n)).clip(0, 30)
-        score_entretien = np.random.normal(5.7, 1, n).clip(2, 7.5)
-        score_competence = np.random.normal(5.4, 1.2, n).clip(2, 7.7)
-        score_personnalite = np.random.normal(67, 10, n).clip(45, 85).astype(int)
+    diplome = np.where(admis,
+                       rng.choice(['Licence', 'Master', 'Doctorat'], m, p=[0.3, 0.55, 0.15]),
+                       rng.choice(['BTS', 'Licence', 'Master'], m, p=[0.55, 0.40, 0.05]))
+    note_anglais = np.where(admis,
+                            rng.normal(78, 10, m).clip(62, 100),
+                            rng.normal(58, 15, m).clip(0, 75))
+    experience = np.where(admis, rng.integers(3, 16, m), rng.integers(0, 8, m))
+    entreprises_precedentes = np.where(admis, rng.poisson(2.2, m), rng.poisson(1.2, m))
+    distance_km = np.where(admis,
+                           np.abs(rng.normal(5, 3, m)).clip(0, 20),
+                           np.abs(rng.normal(13, 7, m)).clip(0, 30))
+    score_entretien = np.where(admis,
+                               rng.normal(8.2, 0.8, m).clip(6.5, 10),
+                               rng.normal(5.7, 1, m).clip(2, 7.5))
+    score_competence = np.where(admis,
+                                rng.normal(8.1, 0.85, m).clip(6, 10),
+                                rng.normal(5.4, 1.2, m).clip(2, 7.7))
+    score_personnalite = np.where(admis,
+                                  rng.normal(82, 8, m).clip(65, 100),
+                                  rng.normal(67, 10, m).clip(45, 85)).astype(int)
 
-    age = np.random.randint(21, 45, n)
-    sexe = np.random.choice(['M', 'F'], n)
-    # Ajout d'un peu de bruit : 10% des samples inversent certains critères pour casser la trop forte linéarité
-    mask = np.random.rand(n) < 0.1
-    if label == 1:
-        note_anglais[mask] = np.random.normal(62, 8, mask.sum()).clip(45, 72)
-        score_competence[mask] = np.random.normal(6, 1, mask.sum()).clip(3, 10)
-    else:
-        note_anglais[mask] = np.random.normal(78, 10, mask.sum()).clip(62, 100)
-        score_competence[mask] = np.random.normal(8, 0.85, mask.sum()).clip(7, 10)
+    age = rng.integers(21, 45, m)
+    sexe = rng.choice(['M', 'F'], m)
+    # Ajout d'un peu de bruit : 10% des samples inversent certains critères pour casser la trop forte linéarité
+    mask = rng.random(m) < 0.1
+    bruit_anglais = np.where(admis,
+                             rng.normal(62, 8, m).clip(45, 72),
+                             rng.normal(78, 10, m).clip(62, 100))
+    bruit_competence = np.where(admis,
+                                rng.normal(6, 1, m).clip(3, 10),
+                                rng.normal(8, 0.85, m).clip(7, 10))
+    note_anglais = np.where(mask, bruit_anglais, note_anglais)
+    score_competence = np.where(mask, bruit_competence, score_competence)
     # On assemble tout
     return pd.DataFrame({
         'age': age,
@@ -52,17 +61,18 @@ def generate_data(n, label):
         'score_competence': np.round(score_competence, 1),
         'score_personnalite': score_personnalite,
         'sexe': sexe,
-        'retenu': label
+        'retenu': labels
     })
 
-# Générer & mélanger
-df1 = generate_data(n, 1)
-df0 = generate_data(n, 0)
-df = pd.concat([df1, df0], axis=0).sample(frac=1, random_state=42).reset_index(drop=True)
+# Classes équilibrées, mélangées avant la génération (pas de concat ni de sample ensuite)
+labels = np.concatenate([np.ones(n, dtype=int), np.zeros(n, dtype=int)])
+rng.shuffle(labels)
+df = generate_data(labels, rng)
 
-# Sauvegarde
-df.to_csv("data/candidats_mlpro.csv", index=False)
+# Sauvegarde en Parquet (colonnaire, typé et compressé) : à relire avec pd.read_parquet
+df.to_parquet("data/candidats_mlpro.parquet", engine="pyarrow", compression="zstd",
+              index=False, row_group_size=4096)
 print(df.head())
 
 # Vérifie
-print(df['retenu'].value_counts())
\ No newline at end of file
+print(df['retenu'].value_counts())
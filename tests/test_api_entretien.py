@@ -0,0 +1,308 @@
+import asyncio
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+import orjson
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from scripts import api_entretien as api
+
+ROWS = [
+    (30, "BTS", 85.0, 5, 2, 4.5, 8.2, 7.5, 80.0, "F"),
+    (24, "Master", 60.0, 1, 0, 12.0, 5.1, 4.9, 65.0, "M"),
+    (41, "Doctorat", 92.0, 12, 3, 2.0, 9.0, 8.8, 90.0, "F"),
+    (35, "Licence", 70.0, 6, None, None, 6.5, 6.0, 72.0, "M"),
+]
+
+
+def _entrainement(n=400, seed=0):
+    """Jeu de données et pipeline construits comme dans le notebook."""
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame({
+        'age': rng.integers(21, 45, n),
+        'diplome': rng.choice(['BTS', 'Licence', 'Master', 'Doctorat'], n),
+        'note_anglais': rng.normal(70, 15, n),
+        'experience': rng.integers(0, 16, n),
+        'entreprises_precedentes': rng.poisson(1.7, n),
+        'distance_km': np.abs(rng.normal(9, 6, n)),
+        'score_entretien': rng.normal(7, 1.5, n),
+        'score_competence': rng.normal(6.8, 1.6, n),
+        'score_personnalite': rng.normal(75, 10, n),
+        'sexe': rng.choice(['M', 'F'], n),
+    })
+    y = (data['score_entretien'] + rng.normal(0, 1, n) > 7).astype(int)
+    return data, y
+
+
+def _pipeline(data, y, scaler=None, handle_unknown='ignore'):
+    cat_features = ['diplome', 'sexe']
+    num_features = [c for c in data.columns if c not in cat_features]
+    preprocessor = ColumnTransformer([
+        ('num', Pipeline([
+            ('imputer', SimpleImputer(strategy='mean')),
+            ('scaler', scaler or StandardScaler()),
+        ]), num_features),
+        ('cat', Pipeline([
+            ('imputer', SimpleImputer(strategy='most_frequent')),
+            ('encoder', OneHotEncoder(handle_unknown=handle_unknown)),
+        ]), cat_features),
+    ])
+    return Pipeline([('preproc', preprocessor), ('clf', LogisticRegression(max_iter=1000))]).fit(data, y)
+
+
+@pytest.fixture
+def modele(tmp_path, monkeypatch):
+    """Sauvegarde un pipeline dans un MODEL_PATH temporaire ; renvoie le pipeline rechargé en mmap."""
+    def sauvegarde(pipeline):
+        path = tmp_path / "pipeline_entretien.joblib"
+        joblib.dump(pipeline, path)
+        monkeypatch.setattr(api, "MODEL_PATH", str(path))
+        monkeypatch.setattr(api, "ONNX_PATH", str(tmp_path / "absent.onnx"))
+        return joblib.load(path, mmap_mode='r')
+    return sauvegarde
+
+
+@pytest.mark.skipif(api.njit is None, reason="numba non installé")
+@pytest.mark.parametrize("scaler", [
+    StandardScaler(),
+    StandardScaler(with_mean=False),
+    StandardScaler(with_std=False),
+])
+def test_linear_scorer_identique_au_pipeline(modele, scaler):
+    pipeline = modele(_pipeline(*_entrainement(), scaler=scaler))
+    attendu = pipeline.predict_proba(api._build_frame(ROWS))
+
+    served = api.load_pipeline()
+
+    assert isinstance(served, api.LinearScorer)
+    predictions, probas = api._predict(served, ROWS)
+    np.testing.assert_allclose(probas, attendu[:, 1], rtol=1e-5)
+    np.testing.assert_array_equal(predictions, pipeline.classes_[attendu.argmax(axis=1)])
+    # Le pipeline d'origine n'est pas modifié par l'extraction des poids
+    np.testing.assert_allclose(pipeline.predict_proba(api._build_frame(ROWS)), attendu)
+
+
+def test_encodeur_strict_garde_le_pipeline_sklearn(modele):
+    pipeline = modele(_pipeline(*_entrainement(), handle_unknown='error'))
+
+    served = api.load_pipeline()
+
+    assert not isinstance(served, (api.LinearScorer, api.EncodedPipeline))
+    inconnu = (30, "Inconnu", 85.0, 5, 2, 4.5, 8.2, 7.5, 80.0, "F")
+    with pytest.raises(ValueError):
+        api._predict(served, [inconnu])
+
+
+def test_encoded_pipeline_identique_au_pipeline(modele, monkeypatch):
+    monkeypatch.setattr(api, "njit", None)
+    pipeline = modele(_pipeline(*_entrainement()))
+    rows = ROWS + [(30, "Inconnu", 85.0, 5, 2, 4.5, 8.2, 7.5, 80.0, "F")]
+    attendu = pipeline.predict_proba(api._build_frame(rows))[:, 1]
+
+    served = api.load_pipeline()
+
+    assert isinstance(served, api.EncodedPipeline)
+    np.testing.assert_allclose(api._predict(served, rows)[1], attendu)
+
+
+class PipelineAge:
+    """Modèle de test déterministe : probabilité = âge / 100 ; un âge de 66 fait échouer le lot."""
+
+    def __init__(self):
+        self.appels = []
+
+    def predict_proba(self, data):
+        ages = data['age'].to_numpy()
+        self.appels.append(len(data))
+        if (ages == 66).any():
+            raise ValueError("âge refusé")
+        p = ages / 100
+        return np.column_stack([1 - p, p])
+
+
+def _candidat(age):
+    return {"age": age, "diplome": "BTS", "note_anglais": 85, "experience": 5, "sexe": "F"}
+
+
+@pytest.fixture
+def modele_age(monkeypatch):
+    pipeline = PipelineAge()
+    monkeypatch.setattr(api, "load_pipeline", lambda: pipeline)
+    api.cache.clear()
+    return pipeline
+
+
+def test_predict_apres_redemarrage(modele_age):
+    # Chaque TestClient démarre l'application dans une nouvelle boucle d'événements
+    for _ in range(2):
+        with TestClient(api.app) as client:
+            response = client.post("/predict", json=_candidat(30))
+            assert response.status_code == 200
+            assert response.json() == {"prediction": 0, "probabilite_retenu": 0.3}
+            api.cache.clear()
+
+
+def test_predict_concurrents(modele_age):
+    ages = list(range(20, 36))
+    with TestClient(api.app) as client, ThreadPoolExecutor(8) as pool:
+        responses = list(pool.map(lambda age: client.post("/predict", json=_candidat(age)), ages))
+    assert [r.json()["probabilite_retenu"] for r in responses] == [age / 100 for age in ages]
+
+
+def test_predict_erreur_du_modele(modele_age):
+    with TestClient(api.app, raise_server_exceptions=False) as client:
+        assert client.post("/predict", json=_candidat(66)).status_code == 500
+        # Le batcher continue de servir après une erreur
+        assert client.post("/predict", json=_candidat(40)).status_code == 200
+
+
+def test_predict_503_si_batcher_arrete(modele_age):
+    with TestClient(api.app) as client:
+        client.portal.call(api.app.state.batcher.stop)
+        assert client.post("/predict", json=_candidat(30)).status_code == 503
+
+
+def test_batcher_regroupe_les_requetes_concurrentes():
+    pipeline = PipelineAge()
+
+    async def scenario():
+        with ThreadPoolExecutor(1) as pool:
+            batcher = api.PredictionBatcher(pipeline, pool)
+            batcher.start()
+            rows = [(age, *ROWS[0][1:]) for age in (20, 30, 40, 50, 60)]
+            results = await asyncio.gather(*(batcher.predict(row) for row in rows))
+            await batcher.stop()
+        return results
+
+    results = asyncio.run(scenario())
+    assert pipeline.appels == [5]
+    assert [proba for _, proba in results] == pytest.approx([0.2, 0.3, 0.4, 0.5, 0.6])
+
+
+def test_batcher_propage_l_erreur_a_tout_le_lot():
+    async def scenario():
+        with ThreadPoolExecutor(1) as pool:
+            batcher = api.PredictionBatcher(PipelineAge(), pool)
+            batcher.start()
+            rows = [(age, *ROWS[0][1:]) for age in (30, 66)]
+            results = await asyncio.gather(*(batcher.predict(row) for row in rows), return_exceptions=True)
+            await batcher.stop()
+        return results
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_batcher_stop_libere_les_requetes_en_attente():
+    bloque = threading.Event()
+
+    class PipelineBloquant(PipelineAge):
+        def predict_proba(self, data):
+            bloque.wait(5)
+            return super().predict_proba(data)
+
+    async def scenario():
+        with ThreadPoolExecutor(1) as pool:
+            batcher = api.PredictionBatcher(PipelineBloquant(), pool)
+            batcher.start()
+            en_cours = asyncio.ensure_future(batcher.predict(ROWS[0]))
+            await asyncio.sleep(0.05)
+            en_file = asyncio.ensure_future(batcher.predict(ROWS[1]))
+            await asyncio.sleep(0)
+            await batcher.stop()
+            bloque.set()
+            return await asyncio.gather(en_cours, en_file, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_dependances_asynchrones():
+    # Une dépendance synchrone serait exécutée dans le pool anyio à chaque requête
+    assert inspect.iscoroutinefunction(api.get_pipeline)
+    assert inspect.iscoroutinefunction(api.get_batcher)
+
+
+def test_batch_sans_pool_anyio(modele_age, monkeypatch):
+    import anyio.to_thread
+    run_sync = anyio.to_thread.run_sync
+    appels = []
+
+    async def espion(*args, **kwargs):
+        appels.append(args[0])
+        return await run_sync(*args, **kwargs)
+
+    with TestClient(api.app) as client:
+        monkeypatch.setattr(anyio.to_thread, "run_sync", espion)
+        response = client.post("/predict_batch", json=[_candidat(30), _candidat(40)])
+        client.post("/predict_batch_stream", json=[_candidat(30)])
+    assert [r["probabilite_retenu"] for r in response.json()] == [0.3, 0.4]
+    assert appels == []
+
+
+def test_cache_lru():
+    cache = api.PredictionCache(max_size=2)
+    cache.put("a", (1, 0.9))
+    cache.put("b", (0, 0.2))
+    assert cache.get("a") == (1, 0.9)  # "a" devient le plus récent
+    cache.put("c", (1, 0.7))           # évince "b", le moins récemment utilisé
+    assert cache.get("b") is None
+    assert cache.get("a") == (1, 0.9)
+    assert cache.get("c") == (1, 0.7)
+    cache.clear()
+    assert cache.get("a") is None
+
+
+def test_predict_utilise_le_cache(modele_age):
+    with TestClient(api.app) as client:
+        premiere = client.post("/predict", json=_candidat(30)).json()
+        appels = len(modele_age.appels)
+        assert client.post("/predict", json=_candidat(30)).json() == premiere
+        assert len(modele_age.appels) == appels
+
+
+def test_cache_vide_au_redemarrage(modele_age):
+    with TestClient(api.app) as client:
+        client.post("/predict", json=_candidat(30))
+    assert api.cache.entries
+    with TestClient(api.app):
+        assert not api.cache.entries
+
+
+def test_batch_doublons_dans_l_ordre(modele_age):
+    ages = [40, 30, 40, 50, 30]
+    with TestClient(api.app) as client:
+        client.post("/predict", json=_candidat(50))  # 50 déjà en cache
+        response = client.post("/predict_batch", json=[_candidat(age) for age in ages])
+    assert [r["probabilite_retenu"] for r in response.json()] == [age / 100 for age in ages]
+    assert [r["prediction"] for r in response.json()] == [0] * len(ages)
+    # Seuls 40 et 30, chacun une seule fois, ont été prédits
+    assert modele_age.appels[-1] == 2
+
+
+def test_stream_ndjson_par_blocs(modele_age, monkeypatch):
+    monkeypatch.setattr(api, "STREAM_CHUNK_SIZE", 2)
+    ages = [21, 22, 23, 24, 25]
+    with TestClient(api.app) as client:
+        response = client.post("/predict_batch_stream", json=[_candidat(age) for age in ages])
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lignes = [orjson.loads(ligne) for ligne in response.content.splitlines()]
+    assert [ligne["probabilite_retenu"] for ligne in lignes] == [age / 100 for age in ages]
+    assert modele_age.appels[-3:] == [2, 2, 1]
+
+
+def test_stream_liste_vide(modele_age):
+    with TestClient(api.app) as client:
+        response = client.post("/predict_batch_stream", json=[])
+    assert response.status_code == 200
+    assert response.content == b""